@@ -1,37 +1,78 @@
 """Run this!"""
 
 
-from collections.abc import Callable, Generator
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
 from typing import NewType, Optional, Union
-from pathlib import Path
-from collections import deque
+from collections import Counter, defaultdict, deque
 from datetime import date
-import re, os, sys, random, time, hashlib
+import re, os, sys, random, time, hashlib, gc
 
 
 SerialNumber = NewType("SerialNumber", str)
-Position = NewType("Position", list[int])
+Position = NewType("Position", tuple[int, int])
 SubmarineInfo = NewType("SubmarineInfo", str)
 MovementLogEntry = NewType("MovementLogEntry", tuple)
 MovementLog = NewType("MovementLog", deque)
 SensorError = NewType("SensorError", dict[str, int])
 SensorErrorList = NewType("SensorErrorList", list)
 Direction = NewType("Direction", str)
+ParsedMovementReports = NewType("ParsedMovementReports", tuple) # (unlogged totals, their invalid directions, logged moves, invalid report count)
+
+
+# How far one unit of distance in each direction moves a submarine, per position axis
+_DIRECTION_DELTAS: dict[Direction, tuple[int, int]] = {
+    "up": (1, 0),
+    "down": (-1, 0),
+    "forward": (0, 1),
+}
+
+# Movement reports are parsed as raw bytes, maps every direction as spelled in a report back to its name
+_REPORT_DIRECTIONS: dict[bytes, Direction] = {dir.encode(): dir for dir in _DIRECTION_DELTAS}
 
 
 class SubmarineSystem:
+    __slots__ = (
+        "_submarines", "_occupied_positions", "_collided_submarines", "_row_index", "_col_index",
+        "_sub_order", "_altitudes", "_distances", "_sensordata_found", "max_report_readers", "max_worker_processes",
+    )
+
     serial_number_pattern = re.compile(r"^\d{8}-\d{2}$")
+    _match_serial_number = staticmethod(serial_number_pattern.match) # Bound once, saves looking up .match on every registration
 
-    def __init__(self) -> None:
+    def __init__(self, max_report_readers: int = 32, max_worker_processes: int = os.cpu_count() or 1) -> None:
         """The system for handling submarines."""
 
+        # How many files move_submarines_by_reports and count_submarines_sensor_errors read at the same time
+        self.max_report_readers: int = max_report_readers
+
+        # How many worker processes the bulk methods spread files over, 1 handles them in this process
+        self.max_worker_processes: int = max_worker_processes
+
         self._submarines: dict[SerialNumber, self._Submarine] = {}
 
-        # Keeps track of which positions submarines has been moved to, so that we can log if another submarine is sent to the same position (collision)
-        self._occupied_positions: dict[tuple, bool] = {}
+        # Where the submarines moved by reports ended up, only membership matters so a set of positions is enough
+        self._occupied_positions: set[tuple] = set()
         self._collided_submarines: list[SubmarineInfo] = []
 
+        # Submarines bucketed by each position axis, so that friendly fire checks only look at submarines in the line of fire.
+        # The buckets are dicts used as ordered sets, so they are walked in a fixed order instead of by memory address.
+        # Every move of a registered submarine re-indexes it, so the buckets always match the live positions
+        self._row_index: defaultdict[int, dict["SubmarineSystem._Submarine", None]] = defaultdict(dict)
+        self._col_index: defaultdict[int, dict["SubmarineSystem._Submarine", None]] = defaultdict(dict)
+
+        # Altitude and squared distance from the base of every submarine, in flat lists indexed by registration order,
+        # so that the extreme queries scan plain ints instead of submarine attributes.
+        # Lists and not array("q"), positions are unbounded ints that can outgrow 64 bits.
+        # Refreshed together with the buckets on every move, so the extremes are always those of the live positions
+        self._sub_order: list[SubmarineSystem._Submarine] = []
+        self._altitudes: list[int] = []
+        self._distances: list[int] = []
+
+        # Set once the 'Sensordata' directory has been seen, so _require_sensordata doesn't stat it again for every submarine
+        self._sensordata_found: bool = False
+
     @property
     def submarines(self) -> Generator[SerialNumber]:
         for k in self._submarines:
@@ -51,6 +92,26 @@ class SubmarineSystem:
     def _get_sub(self, serial_number: SerialNumber) -> "SubmarineSystem._Submarine":
         return self._submarines.get(serial_number)
 
+    def _index_sub(self, sub: "SubmarineSystem._Submarine") -> None:
+        """Add the submarine to the position index buckets of its current position, and store its position in the position lists."""
+
+        self._row_index[sub._x][sub] = None
+        self._col_index[sub._y][sub] = None
+
+        self._altitudes[sub.index] = sub._x
+        self._distances[sub.index] = sub.dist_from_base
+
+    def _unindex_sub(self, sub: "SubmarineSystem._Submarine") -> None:
+        """Remove the submarine from the position index buckets of its current position."""
+
+        for index, key in ( (self._row_index, sub._x), (self._col_index, sub._y) ):
+            bucket = index[key]
+            bucket.pop(sub, None)
+
+            # Drop emptied buckets, so the index doesn't grow with every position a submarine has passed through
+            if not bucket:
+                del index[key]
+
     def lookup_submarine(self, serial_number: SerialNumber) -> Optional[SubmarineInfo]:
         """Get a submarine by serial number if it exists."""
 
@@ -64,18 +125,44 @@ class SubmarineSystem:
     def register_submarine(self, serial_number: SerialNumber) -> None:
         """Register a submarine of given 'serial_number'."""
 
-        if not self.serial_number_pattern.match(serial_number):
+        if not self._match_serial_number(serial_number):
             raise ValueError("Serial number must be in the format XXXXXXXX-XX")
 
-        if not self._get_sub(serial_number) is None:
+        self._add_submarine(serial_number)
+
+    def _add_submarine(self, serial_number: SerialNumber) -> None:
+        """Register a submarine of given, already validated, 'serial_number'."""
+
+        old_sub = self._submarines.get(serial_number)
+        if not old_sub is None:
             print(f"Warning: Submarine {serial_number} already registered! Overwriting.")
+            self._unindex_sub(old_sub)
+            old_sub._system = None # The replaced submarine must no longer write to the indexes when moved
+
+            # Take over the old submarine's slot in the position lists
+            index = old_sub.index
+        else:
+            index = len(self._sub_order)
+            self._sub_order.append(None)
+            self._altitudes.append(0)
+            self._distances.append(0)
 
         # Create new submarine
-        self._submarines[serial_number] = self._Submarine(serial_number)
+        sub = self._Submarine(serial_number, index, self)
+        self._submarines[serial_number] = sub
+        self._sub_order[index] = sub
+        self._index_sub(sub)
     
     def clear_submarines(self) -> None:
         """Removes all registered submarines."""
+        for sub in self._sub_order:
+            sub._system = None
         self._submarines.clear()
+        self._row_index.clear()
+        self._col_index.clear()
+        self._sub_order.clear()
+        self._altitudes.clear()
+        self._distances.clear()
 
     def activate_nuke(self, serial_number: SerialNumber, auth_string: str) -> None:
         """
@@ -97,31 +184,28 @@ class SubmarineSystem:
         """Prevents friendly fire when ordering a torpedo."""
 
         def wrapper(system: "SubmarineSystem", serial_number: SerialNumber, dir: Direction) -> Union[bool, SubmarineInfo]:
-            friendly_fire = False
             firing_sub = system._get_sub(serial_number)
 
+            if firing_sub is None:
+                return func(system, serial_number, dir)
+
+            firing_row, firing_col = firing_sub._x, firing_sub._y
+
+            # Only submarines sharing the firing axis can be in the line of fire, the first registered one is reported like a scan of all submarines would
             match dir:
                 case "up":
-                    for _, sub in system._submarines.items():
-                        if sub==firing_sub: continue
-                        if firing_sub.position[1] == sub.position[1] and sub.position[0] >= firing_sub.position[0]:
-                            friendly_fire = True
-                            break
+                    in_line_of_fire = ( sub for sub in system._col_index.get(firing_col, ()) if sub._x >= firing_row and not sub is firing_sub )
                 case "down":
-                    for _, sub in system._submarines.items():
-                        if sub==firing_sub: continue
-                        if firing_sub.position[1] == sub.position[1] and sub.position[0] <= firing_sub.position[0]:
-                            friendly_fire = True
-                            break
+                    in_line_of_fire = ( sub for sub in system._col_index.get(firing_col, ()) if sub._x <= firing_row and not sub is firing_sub )
                 case "forward":
-                    for _, sub in system._submarines.items():
-                        if sub==firing_sub: continue
-                        if firing_sub.position[0] == sub.position[0] and sub.position[1] >= firing_sub.position[1]:
-                            friendly_fire = True
-                            break
-            
-            if friendly_fire:
-                return sub
+                    in_line_of_fire = ( sub for sub in system._row_index.get(firing_row, ()) if sub._y >= firing_col and not sub is firing_sub )
+                case _:
+                    in_line_of_fire = ()
+
+            friendly_sub = min(in_line_of_fire, key=lambda sub: sub.index, default=None)
+
+            if not friendly_sub is None:
+                return friendly_sub
             else:
                 return func(system, serial_number, dir)
 
@@ -144,8 +228,17 @@ class SubmarineSystem:
         sub.fire_torpedo(dir)
         return True
     
-    def torpedo_graphic(self) -> None:
-        """Fancy torpedo graphics!!"""
+    def torpedo_graphic(self, enabled: Optional[bool] = None) -> None:
+        """
+        Fancy torpedo graphics!!
+        Skipped by default when stdout is not a terminal or SUB_NO_GRAPHIC=1 is set, since the animation sleeps for over 2 seconds.
+        """
+        if enabled is None:
+            enabled = sys.stdout.isatty() and os.environ.get("SUB_NO_GRAPHIC") != "1"
+
+        if not enabled:
+            return
+
         for _ in range(3):
             steps = 40
             for i in range(steps):
@@ -153,6 +246,14 @@ class SubmarineSystem:
                 time.sleep(0.02)
             print()
         
+    def _require_sensordata(self) -> None:
+        """Raise FileNotFoundError if there is no 'Sensordata' directory, only checked until it has been seen once."""
+
+        if not self._sensordata_found:
+            if not os.path.isdir("Sensordata"):
+                raise FileNotFoundError("No 'Sensordata' directory detected.")
+            self._sensordata_found = True
+
     def count_sensor_errors(self, serial_number: SerialNumber) -> SensorErrorList:
         """
         Returns a list of all types of sensor errors that occured,
@@ -160,25 +261,52 @@ class SubmarineSystem:
         and how many sensors that failed during said error/errors.
         """
 
-        if not os.path.isdir("Sensordata"):
-            raise FileNotFoundError("No 'Sensordata' directory detected.")
+        self._require_sensordata()
         
         sub = self._get_sub(serial_number)
         if sub is None:
             raise LookupError(f"Submarine '{serial_number}' not found.")
 
-        errors: dict[str, SensorError] = {}
-        for line in sub.sensor_data:
-            if not "0" in line: continue # No error
+        return self._count_sensor_data_errors( sub.read_sensor_data() )
 
-            if not errors.get(line):
-                sensor_failures = line.count("0") # use str.count, since it is implemented in C, it is faster than looping through the string
-                error: SensorError = dict(sensor_failures=sensor_failures, error_occurences=1)
-                errors[line] = error # New error type, register 1
-            else:
-                errors[line]["error_occurences"] += 1 # Reoccuring error, add 1
+    def count_submarines_sensor_errors(self, serial_numbers: Iterable[SerialNumber]) -> Generator[tuple[SerialNumber, SensorErrorList]]:
+        """Count the sensor errors of several submarines, yielding each serial number with its sensor errors in the given order."""
+
+        self._require_sensordata()
 
-        return list( errors.values() )
+        serial_numbers = list(serial_numbers)
+        for serial_number in serial_numbers:
+            if self._get_sub(serial_number) is None:
+                raise LookupError(f"Submarine '{serial_number}' not found.")
+
+        if self.max_worker_processes <= 1:
+            # Counting can't be spread out on a single core, so only overlap reading the files with counting them instead
+            for serial_number, sensor_data in self._read_ahead(self._Submarine.read_sensor_file, serial_numbers):
+                yield serial_number, self._count_sensor_data_errors(sensor_data)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_worker_processes) as executor:
+            # Chunked, so that the serial numbers and results are sent to and from the workers in batches
+            yield from zip( serial_numbers, executor.map(self._count_sensor_file_errors, serial_numbers, chunksize=16) )
+
+    @staticmethod
+    def _count_sensor_file_errors(serial_number: SerialNumber) -> SensorErrorList:
+        """Count the sensor errors in the sensor data file of a serial number."""
+        return SubmarineSystem._count_sensor_data_errors( SubmarineSystem._Submarine.read_sensor_file(serial_number) )
+
+    @staticmethod
+    def _count_sensor_data_errors(sensor_data: Iterable[bytes]) -> SensorErrorList:
+        # Count every distinct line in one C-level Counter pass, then only inspect the distinct lines that are errors
+        line_occurences = Counter(sensor_data)
+
+        # use bytes.count, since it is implemented in C, it is faster than looping through the line
+        errors: SensorErrorList = [
+            dict(sensor_failures=line.count(b"0"), error_occurences=occurences)
+            for line, occurences in line_occurences.items()
+            if b"0" in line # Lines without a 0 are no error
+        ]
+
+        return errors
 
     def get_submarine_movement_log(self, serial_number: SerialNumber) -> MovementLog:
         """Retrieve the latest movement logs for the submarine."""
@@ -196,43 +324,39 @@ class SubmarineSystem:
         if not os.path.isdir("MovementReports"):
             raise FileNotFoundError("No 'MovementReports' directory detected.")
         
-        list_dir = os.listdir("MovementReports")
-        return len(list_dir)
+        return sum(1 for _ in self._movement_report_serial_numbers())
         
-    def register_submarines_by_movement_reports(self):
+    def register_submarines_by_movement_reports(self) -> list[SerialNumber]:
         """
         Register submarines by movement reports.
+        Returns the serial numbers that were registered, in directory order.
         """
 
         if not os.path.isdir("MovementReports"):
             raise FileNotFoundError("No 'MovementReports' directory detected.")
 
-        list_dir = os.listdir("MovementReports")
-        for file_name in list_dir:
-            serial_number = Path(file_name).stem
-            self.register_submarine(serial_number)
+        serial_numbers = list( self._movement_report_serial_numbers() )
 
-    @staticmethod
-    def _collision_logger(func: Callable) -> Callable:
-        """Logs collisions between submarines."""
+        # Already validated, skip straight to adding them
+        for serial_number in serial_numbers:
+            self._add_submarine(serial_number)
 
-        def wrapper(system: "SubmarineSystem", serial_number: SerialNumber):
-            return_value = func(system, serial_number)
+        return serial_numbers
 
-            sub = system._get_sub(serial_number)
-            pos = (sub.position[0], sub.position[1])
+    def _movement_report_serial_numbers(self) -> Generator[SerialNumber]:
+        """Get the serial numbers of the movement report files."""
 
-            if system._occupied_positions.get(pos):
-                system._collided_submarines.append(sub)
-                print(f"Warning: {sub} has collided with another submarine!")
-            else:
-                system._occupied_positions[pos] = True
+        with os.scandir("MovementReports") as entries:
+            for entry in entries:
+                name = entry.name
+
+                # is_file uses the file type cached by scandir, no extra stat call
+                if not name.endswith(".txt") or not entry.is_file(): continue
+
+                serial_number = name[:-4]
+                if self._match_serial_number(serial_number):
+                    yield serial_number
 
-            return return_value
-        
-        return wrapper
-    
-    @_collision_logger
     def move_submarine_by_reports(self, serial_number: SerialNumber) -> None:
         """Read movement reports for this submarine, and move it accordingly"""
 
@@ -241,35 +365,133 @@ class SubmarineSystem:
         if sub is None:
             raise LookupError(f"Submarine '{serial_number}' not found.")
 
-        for dir, dist in sub.movement:
-            sub.move(dir, dist)
+        self._apply_movement_reports( sub, self._parse_movement_reports(sub.read_movement_reports(), sub.max_move_logs) )
 
-    def get_furthest_submarine(self) -> SubmarineInfo:
-        """Get the submarine furthest from the base."""
+    def move_submarines_by_reports(self, serial_numbers: Iterable[SerialNumber]) -> Generator[SerialNumber]:
+        """Move several submarines by their movement reports, yielding each serial number once its submarine has been moved."""
 
-        sorted_subs = self._get_subs_sorted_dist()
-        return str(sorted_subs[len(sorted_subs) - 1])
+        subs = []
+        for serial_number in serial_numbers:
+            sub = self._get_sub(serial_number)
 
-    def get_closest_submarine(self) -> SubmarineInfo:
-        """Get the submarine closest to the base."""
+            if sub is None:
+                raise LookupError(f"Submarine '{serial_number}' not found.")
 
-        sorted_subs = self._get_subs_sorted_dist()
-        return str(sorted_subs[0])
+            subs.append(sub)
 
-    def get_lowest_submarine(self) -> SubmarineInfo:
-        """Get the submarine at the lowest point form the base."""
+        if self.max_worker_processes <= 1:
+            for serial_number, parsed in self._read_ahead( self._parse_movement_report_file, [sub.serial_number for sub in subs] ):
+                self._apply_movement_reports(self._submarines[serial_number], parsed)
+                yield serial_number
+            return
 
-        sorted_subs = self._get_subs_sorted_vertical()
-        return str(sorted_subs[0])
+        with ProcessPoolExecutor(max_workers=self.max_worker_processes) as executor:
+            # Chunked, so that the serial numbers and parsed reports are sent to and from the workers in batches
+            all_parsed = executor.map( self._parse_movement_report_file, [sub.serial_number for sub in subs], chunksize=16 )
 
-    def get_highest_submarine(self) -> SubmarineInfo:
-        """Get the submarine at the highest point from the base."""
+            for sub, parsed in zip(subs, all_parsed):
+                self._apply_movement_reports(sub, parsed)
+                yield sub.serial_number
+
+    def _read_ahead(self, read: Callable, items: Iterable) -> Generator[tuple]:
+        """Yield every item together with read(item), in order, while a thread pool reads the items that come after it."""
+
+        read_ahead = 2*self.max_report_readers # Bounds how many read files wait in memory
+
+        with ThreadPoolExecutor(max_workers=self.max_report_readers) as executor:
+            pending = deque()
 
-        sorted_subs = self._get_subs_sorted_vertical()
-        return str(sorted_subs[len(sorted_subs) - 1])
+            for item in items:
+                pending.append( (item, executor.submit(read, item)) )
+
+                if len(pending) >= read_ahead:
+                    item, result = pending.popleft()
+                    yield item, result.result()
+
+            while pending:
+                item, result = pending.popleft()
+                yield item, result.result()
 
     @staticmethod
-    def _safe_sort_subs(func: Callable) -> Callable:
+    def _parse_movement_report_file(serial_number: SerialNumber) -> ParsedMovementReports:
+        """Read and parse the movement reports file of a serial number."""
+        return SubmarineSystem._parse_movement_reports( SubmarineSystem._Submarine.read_movement_report_file(serial_number), SubmarineSystem._Submarine.max_move_logs )
+
+    @staticmethod
+    def _parse_movement_reports(reports: list[bytes], max_move_logs: int) -> ParsedMovementReports:
+        """Parse the lines of a movement reports file into direction totals, invalid directions, logged moves and the invalid report count."""
+
+        # Only the last 'max_move_logs' moves survive in the movement log, find the first report line that needs to be logged
+        first_logged = len(reports)
+        logged = 0
+        while first_logged > 0 and logged < max_move_logs:
+            first_logged -= 1
+            split = reports[first_logged].split()
+            if len(split) == 2 and split[1].isdigit():
+                logged += 1
+
+        # Invalid movement reports are skipped and counted, then warned about once per submarine
+        invalid_reports = 0
+
+        # Moves that are not logged only decide where the submarine ends up, so sum their distances per direction to apply them in one go
+        totals = dict.fromkeys(_DIRECTION_DELTAS, 0)
+        invalid_directions = []
+        for line in reports[:first_logged]:
+            split = line.split()
+
+            # This movement report was invalid, skip and continue
+            if len(split) != 2 or not split[1].isdigit():
+                invalid_reports += 1
+                continue
+
+            dir = _REPORT_DIRECTIONS.get(split[0])
+            if dir is not None:
+                totals[dir] += int(split[1])
+            else:
+                invalid_directions.append( split[0].decode(errors="replace") )
+
+        logged_moves = []
+        for line in reports[first_logged:]:
+            split = line.split()
+
+            # This movement report was invalid, skip and continue
+            if len(split) != 2 or not split[1].isdigit():
+                invalid_reports += 1
+                continue
+
+            logged_moves.append( (_REPORT_DIRECTIONS.get(split[0]) or split[0].decode(errors="replace"), int(split[1])) )
+
+        return totals, invalid_directions, logged_moves, invalid_reports
+
+    def _apply_movement_reports(self, sub: "SubmarineSystem._Submarine", parsed: ParsedMovementReports) -> None:
+        """Move the submarine according to its parsed movement reports."""
+
+        totals, invalid_directions, logged_moves, invalid_reports = parsed
+
+        for dir in invalid_directions:
+            print(f"Warning: Invalid direction '{dir}'")
+
+        sub.move_totals(totals)
+
+        move = sub.move
+        # Interned, so that the logs of every submarine share one string object per direction instead of one per report line,
+        # done here since directions parsed in a worker process arrive as fresh copies
+        for dir, dist in logged_moves:
+            move(sys.intern(dir), dist)
+
+        if invalid_reports:
+            print(f"Warning: {invalid_reports} movement report(s) for {sub} were invalid. Skipped.")
+
+        # The submarine has collided if it ended up where an earlier moved submarine already is
+        pos = (sub._x, sub._y)
+        if pos in self._occupied_positions:
+            self._collided_submarines.append(str(sub))
+            print(f"Warning: {sub} has collided with another submarine!")
+        else:
+            self._occupied_positions.add(pos)
+
+    @staticmethod
+    def _require_subs(func: Callable) -> Callable:
         def wrapper(system: "SubmarineSystem"):
             if len(system._submarines) == 0:
                 raise ValueError("No submarines registered.")
@@ -277,49 +499,119 @@ class SubmarineSystem:
             return func(system)
 
         return wrapper
-    
-    @_safe_sort_subs
-    def _get_subs_sorted_dist(self) -> list["_Submarine"]:
-        """Get submarines sorted by distance from the base."""
 
-        return sorted(self._submarines.values(), key=lambda submarine: submarine.dist_from_base)
+    # Only the extremes are needed, so a single min/max scan over the position lists replaces sorting the whole fleet.
+    # The max scans walk the submarines in reverse, to pick the same submarine on ties as the last element of a stable sort would.
+
+    @_require_subs
+    def get_furthest_submarine(self) -> SubmarineInfo:
+        """Get the submarine furthest from the base."""
+
+        index = max(reversed(range(len(self._distances))), key=self._distances.__getitem__)
+        return str(self._sub_order[index])
 
-    @_safe_sort_subs
-    def _get_subs_sorted_vertical(self) -> list["_Submarine"]:
-        """Get submarines sorted by altetude from the base."""
+    @_require_subs
+    def get_closest_submarine(self) -> SubmarineInfo:
+        """Get the submarine closest to the base."""
+
+        index = min(range(len(self._distances)), key=self._distances.__getitem__)
+        return str(self._sub_order[index])
+
+    @_require_subs
+    def get_lowest_submarine(self) -> SubmarineInfo:
+        """Get the submarine at the lowest point form the base."""
+
+        index = min(range(len(self._altitudes)), key=self._altitudes.__getitem__)
+        return str(self._sub_order[index])
+
+    @_require_subs
+    def get_highest_submarine(self) -> SubmarineInfo:
+        """Get the submarine at the highest point from the base."""
 
-        return sorted(self._submarines.values(), key=lambda submarine: submarine.position[0])
+        index = max(reversed(range(len(self._altitudes))), key=self._altitudes.__getitem__)
+        return str(self._sub_order[index])
 
     class _Submarine:
+        __slots__ = ("_serial_number", "_index", "_system", "_x", "_y", "_movement_log", "_dist_from_base")
+
         max_move_logs = 50
 
-        def __init__(self, serial_number: SerialNumber) -> None:
+        # Parsed contents of the secrets files, loaded once on first use and shared by all submarines
+        _secret_keys: Optional[dict[SerialNumber, str]] = None
+        _activation_codes: Optional[dict[SerialNumber, str]] = None
+
+        # SHA-256 state after hashing today's date, every submarine's auth string starts with it
+        _day_hash_date: Optional[date] = None
+        _day_hash = None
+
+        def __init__(self, serial_number: SerialNumber, index: int, system: "SubmarineSystem") -> None:
             self._serial_number: SerialNumber = serial_number
-            self._position: Position = Position([0, 0])
+            self._index: int = index # Slot in the system's position lists
+            self._system: Optional[SubmarineSystem] = system # Re-indexes the submarine on every move, None once it is no longer registered
+            # The position as two flat ints, moving is a plain integer add with no list or tuple to go through
+            self._x: int = 0 # Altitude
+            self._y: int = 0 # Forward distance
+            # A bounded deque is already a fixed-size ring buffer implemented in C, appending evicts the oldest entry in O(1)
             self._movement_log: MovementLog = deque(maxlen=self.max_move_logs)
 
+            # Cached distance from the base, cleared on every move
+            self._dist_from_base: Optional[int] = 0
+
         def fire_torpedo(self, _: Direction) -> None:
             """Torpedo firing logic here..."""
 
-        def _find_my_secret_key(self) -> str:
-            with open("Secrets/SecretKEY.txt") as f:
+        @staticmethod
+        def _read_secrets_file(path: str) -> dict[SerialNumber, str]:
+            """Parse a 'serial_number:secret' file, the first entry for a serial number wins."""
+
+            secrets: dict[SerialNumber, str] = {}
+            with open(path) as f:
                 for line in f:
                     split = line.split(":")
-                    
-                    if split[0] == self.serial_number:
-                        return split[1].strip("\n")
-                    
-            raise LookupError(f"Could not find {self} secret key.")
+
+                    if len(split) >= 2 and not split[0] in secrets:
+                        secrets[split[0]] = split[1].strip("\n")
+
+            return secrets
+
+        @classmethod
+        def _load_secrets(cls) -> None:
+            """Read both secrets files, unless they have already been read."""
+
+            if cls._secret_keys is None:
+                cls._secret_keys = cls._read_secrets_file("Secrets/SecretKEY.txt")
+
+            if cls._activation_codes is None:
+                cls._activation_codes = cls._read_secrets_file("Secrets/ActivationCodes.txt")
+
+        def _find_my_secret_key(self) -> str:
+            self._load_secrets()
+            key = self._secret_keys.get(self.serial_number)
+
+            if key is None:
+                raise LookupError(f"Could not find {self} secret key.")
+
+            return key
         
         def _find_my_activation_code(self) -> str:
-            with open("Secrets/ActivationCodes.txt") as f:
-                for line in f:
-                    split = line.split(":")
+            self._load_secrets()
+            code = self._activation_codes.get(self.serial_number)
 
-                    if split[0] == self.serial_number:
-                        return split[1].strip("\n")
-                    
-            raise LookupError(f"Could not find {self} activation code.")
+            if code is None:
+                raise LookupError(f"Could not find {self} activation code.")
+
+            return code
+
+        @classmethod
+        def _get_day_hash(cls):
+            """Get a fresh copy of the SHA-256 state primed with today's date."""
+
+            today = date.today()
+            if cls._day_hash_date != today:
+                cls._day_hash = hashlib.sha256( str(today).encode() )
+                cls._day_hash_date = today
+
+            return cls._day_hash.copy()
 
         def ready_nuke(self, hex_str: str) -> bool:
             if not os.path.isfile("Secrets/ActivationCodes.txt"):
@@ -328,11 +620,10 @@ class SubmarineSystem:
             if not os.path.isfile("Secrets/SecretKEY.txt"):
                 raise FileNotFoundError("'SecretKEY.txt' not found.")
 
-            date_now_str = str( date.today() )
             key = self._find_my_secret_key()
             code = self._find_my_activation_code()
-            combined_string = date_now_str+key+code
-            sha = hashlib.sha256( combined_string.encode() )
+            sha = self._get_day_hash()
+            sha.update( (key+code).encode() )
 
             # Ready nuke logic here...
 
@@ -342,74 +633,115 @@ class SubmarineSystem:
         def serial_number(self) -> SerialNumber:
             return self._serial_number
 
+        @property
+        def index(self) -> int:
+            return self._index
+
         @property
         def position(self) -> Position:
-            return self._position
+            return (self._x, self._y)
 
         @property
-        def dist_from_base(self) -> float:
+        def dist_from_base(self) -> int:
             """ The un-squared distance from the base. """
-            return self._position[0] ** 2 + self._position[1] ** 2
+
+            if self._dist_from_base is None:
+                self._dist_from_base = self._x*self._x + self._y*self._y
+
+            return self._dist_from_base
 
         @property
         def movement_log(self) -> MovementLog:
             return self._movement_log
 
         @property
-        def sensor_data(self) -> Generator[str]:
-            if not os.path.isfile(f"Sensordata/{self.serial_number}.txt"):
-                raise FileNotFoundError("No sensor data file detected.")
-        
-            with open(f"Sensordata/{self.serial_number}.txt") as f:
-                for line in f:
+        def sensor_error_lines(self) -> Generator[bytes]:
+            """The sensor data lines that report an error, as raw bytes."""
+
+            # One bulk read instead of resuming a text file iterator per line, lines without a failed sensor are skipped undecoded
+            for line in self.read_sensor_data():
+                if b"0" in line:
                     yield line
 
-        @property
-        def movement(self) -> Generator[str, int]:
-            if not os.path.isfile(f"MovementReports/{self.serial_number}.txt"):
-                raise FileNotFoundError("No movement reports file detected.")
+        def read_sensor_data(self) -> list[bytes]:
+            """Read all lines of the sensor data file in one go, as raw bytes since they are never decoded."""
+            return self.read_sensor_file(self.serial_number)
 
-            with open(f"MovementReports/{self.serial_number}.txt") as f:
-                for line in f:
-                    split = line.split()
+        @staticmethod
+        def read_sensor_file(serial_number: SerialNumber) -> list[bytes]:
+            """Read all lines of the sensor data file of a serial number, like read_sensor_data."""
+
+            # Let open report a missing file, instead of a separate stat call for every submarine
+            try:
+                f = open(f"Sensordata/{serial_number}.txt", "rb")
+            except FileNotFoundError:
+                raise FileNotFoundError("No sensor data file detected.") from None
 
-                    # This movement report was invalid, skip and continue
-                    if len(split) != 2 or not split[1].isdigit():
-                        print(f"Warning: One movement report for {self} is invalid. Skipping.")
-                        continue
+            with f:
+                return f.read().splitlines()
 
-                    yield split[0], int(split[1])
+        def read_movement_reports(self) -> list[bytes]:
+            """
+            Read all lines of the movement reports file in one go.
+            Kept as raw bytes, so that the lines are split and validated without being decoded first.
+            """
+            return self.read_movement_report_file(self.serial_number)
 
         @staticmethod
-        def _log_movement(func: Callable) -> Callable:
-            def wrapper(sub: "SubmarineSystem._Submarine", dir: str, dist: int):
-                old_pos = (sub.position[0], sub.position[1])
-                
-                return_value = func(sub, dir, dist)
+        def read_movement_report_file(serial_number: SerialNumber) -> list[bytes]:
+            """Read all lines of the movement reports file of a serial number, like read_movement_reports."""
 
-                new_pos = (sub.position[0], sub.position[1])
-                
-                log_entry: MovementLogEntry = (old_pos, dir, dist, new_pos)
-                sub._movement_log.append(log_entry)
+            try:
+                f = open(f"MovementReports/{serial_number}.txt", "rb")
+            except FileNotFoundError:
+                raise FileNotFoundError("No movement reports file detected.") from None
 
-                return return_value
+            with f:
+                return f.read().splitlines() # Splits on the same line endings as reading in text mode
 
-            return wrapper
+        def move_totals(self, totals: dict[Direction, int]) -> None:
+            """Move the submarine the summed up distance of each direction, without logging the movement."""
+
+            system = self._system
+            if not system is None:
+                system._unindex_sub(self)
+
+            for dir, dist in totals.items():
+                d_x, d_y = _DIRECTION_DELTAS[dir]
+                self._x += d_x*dist
+                self._y += d_y*dist
+
+            self._dist_from_base = None
+
+            if not system is None:
+                system._index_sub(self)
 
-        @_log_movement
         def move(self, dir: Direction, dist: int) -> None:
-            match dir:
-                case "up":
-                    self._position[0] += dist
-                case "down":
-                    self._position[0] -= dist
-                case "forward":
-                    self._position[1] += dist
-                case _:
-                    print(f"Warning: Invalid direction '{dir}'")
+            """Move the submarine, and log the movement."""
+
+            old_pos = (self._x, self._y)
+            delta = _DIRECTION_DELTAS.get(dir)
+
+            if delta is None:
+                print(f"Warning: Invalid direction '{dir}'")
+            else:
+                system = self._system
+                if not system is None:
+                    system._unindex_sub(self)
+
+                d_x, d_y = delta
+                self._x += d_x*dist
+                self._y += d_y*dist
+                self._dist_from_base = None
+
+                if not system is None:
+                    system._index_sub(self)
+
+            log_entry: MovementLogEntry = (old_pos, dir, dist, (self._x, self._y))
+            self._movement_log.append(log_entry)
 
         def __str__(self) -> str:
-            return f"|Submarine {self._serial_number} at {self._position}|"
+            return f"|Submarine {self._serial_number} at [{self._x}, {self._y}]|"
 
 
 
@@ -417,8 +749,14 @@ if __name__ == "__main__":
     """Submarine system showcase!"""
 
     system: SubmarineSystem = SubmarineSystem()
-    system.register_submarines_by_movement_reports()
-    submarine_test_limit = ( len(sys.argv) >= 2 and int( sys.argv[1] ) or system.get_submarine_count_by_movement_reports())
+
+    # Registration only allocates objects that stay alive, so the cyclic garbage collector would just rescan them over and over
+    gc.disable()
+    try:
+        registered_serial_numbers: list[SerialNumber] = system.register_submarines_by_movement_reports()
+    finally:
+        gc.enable()
+    submarine_test_limit = ( len(sys.argv) >= 2 and int( sys.argv[1] ) or len(registered_serial_numbers) ) # No need to scan the reports directory a second time
 
 
     class _Colors(Enum):
@@ -434,14 +772,19 @@ if __name__ == "__main__":
         ITALIC = "\033[3m"
 
 
+    _BANNER_FOOTER = "-" * 20 + _Colors.ENDC.value + "\n"
+
+
     def _pretty_print(text: str, color: str) -> Callable:
+        banner_header = color + text + "\n" # Built once per decorated function instead of on every call
+
         def decorator(func: Callable) -> Callable:
             def wrapper(*args, **kwargs):
-                print(color + text)
+                sys.stdout.write(banner_header)
 
                 return_value = func(*args, **kwargs)
                 
-                print("-" * 20 + _Colors.ENDC.value)
+                sys.stdout.write(_BANNER_FOOTER)
 
                 return return_value
             
@@ -451,16 +794,16 @@ if __name__ == "__main__":
 
     @_pretty_print("Moving submarine by reports...", _Colors.ITALIC.value)
     def _move_submarines() -> SerialNumber:
-        for serial_number, i in zip( system.submarines, range(submarine_test_limit) ):
-            system.move_submarine_by_reports(serial_number)
+        serial_numbers = [serial_number for serial_number, _ in zip( system.submarines, range(submarine_test_limit) )]
+        for i, serial_number in enumerate( system.move_submarines_by_reports(serial_numbers) ):
             print(f"{i+1}/{submarine_test_limit} movement reports progress...")
         return serial_number
     
 
     @_pretty_print("Counting sensor errors...", _Colors.ITALIC.value)
     def _count_sensor_errors() -> tuple[SerialNumber, SensorErrorList]:
-        for serial_number, i in zip( system.submarines, range(submarine_test_limit) ):
-            sensor_errors: SensorErrorList = system.count_sensor_errors(serial_number)
+        serial_numbers = [serial_number for serial_number, _ in zip( system.submarines, range(submarine_test_limit) )]
+        for i, (serial_number, sensor_errors) in enumerate( system.count_submarines_sensor_errors(serial_numbers) ):
             print(f"{i+1}/{submarine_test_limit} sensor error progress...")  
         return serial_number, sensor_errors
 
@@ -470,9 +813,9 @@ if __name__ == "__main__":
         entries = 50
 
         print(system.lookup_submarine(serial_number), f"sensor errors (showing {entries}/{len(sensor_errors)} entries):")
-        for error, i in zip(sensor_errors, range(1, entries+1)):
-            print(f"Error type {i}: {error}", end=i%2==0 and "\n" or ", ")
-        print()
+        # Two entries per line, written at once instead of one print call per entry
+        error_lines = ( f"Error type {i}: {error}" + (i%2==0 and "\n" or ", ") for i, error in enumerate(sensor_errors[:entries], start=1) )
+        sys.stdout.write("".join(error_lines) + "\n")
 
         print("^^^^^^^^^^^ Sensor error log")
 
@@ -482,8 +825,8 @@ if __name__ == "__main__":
         print(f"{system.lookup_submarine(serial_number)} ({system.max_move_logs} entries)")
         
         movement_log: MovementLog = system.get_submarine_movement_log(serial_number)
-        for entry in movement_log:
-            print(entry)
+        log_lines = ( f"{entry}\n" for entry in movement_log )
+        sys.stdout.write("".join(log_lines))
         
         print("^^^^^^^^^^^ Movement log")
 
@@ -517,8 +860,8 @@ if __name__ == "__main__":
         torpedo_failures = 0
         torpedo_failure_prints = 0
         max_torpedo_failure_prints = 50
-        for serial_number, _ in zip( system.submarines, range(submarine_test_limit) ):
-            direction = random.choice(("up", "down", "forward"))
+        directions = random.choices( ("up", "down", "forward"), k=submarine_test_limit ) # Drawn in one call instead of one random.choice per torpedo
+        for serial_number, direction in zip(system.submarines, directions):
             return_value = system.order_torpedo(serial_number, direction)
 
             if not return_value is True:
@@ -33,6 +33,12 @@ class SubSysTest(unittest.TestCase):
         
         return decorator
 
+    def _move_test_submarine(self, serial_number: SerialNumber, *reports: bytes) -> None:
+        """Move a registered test submarine by the given movement report lines, without a movement reports file."""
+
+        sub = self.system._get_sub(serial_number)
+        self.system._apply_movement_reports( sub, self.system._parse_movement_reports(list(reports), sub.max_move_logs) )
+
     @_create_test_submarine("78532608-69")
     def test_count_sensor_errors_returns_valid_list(self):
         sensor_errors = self.system.count_sensor_errors("78532608-69")
@@ -41,6 +47,13 @@ class SubSysTest(unittest.TestCase):
         for error_entry in sensor_errors:
             self.assertIsInstance(error_entry, dict)
             
+    @_create_test_submarine("78532608-69")
+    def test_sensor_error_lines_are_the_sensor_lines_with_a_failure(self):
+        sub = self.system._get_sub("78532608-69")
+        error_lines = list(sub.sensor_error_lines)
+
+        self.assertEqual( error_lines, [line for line in sub.read_sensor_data() if b"0" in line] )
+
     @_create_test_submarine("78532608-69")
     def test_get_submarine_movement_log_returns_valid_deque(self):
         self.system.move_submarine_by_reports("78532608-69")
@@ -70,6 +83,84 @@ class SubSysTest(unittest.TestCase):
         for sub in collided_subs:
             self.assertIsInstance(sub, str)
 
+    def test_moving_submarines_records_collisions(self):
+        for serial_number in ("00000000-01", "00000000-02", "00000000-03"):
+            self.system.register_submarine(serial_number)
+
+        self._move_test_submarine("00000000-01", b"forward 2", b"up 1")
+        self.assertEqual(self.system.collided_submarines, [])
+
+        self._move_test_submarine("00000000-02", b"up 1", b"forward 2")
+        self.assertEqual( self.system.collided_submarines, [self.system.lookup_submarine("00000000-02")] )
+
+        self._move_test_submarine("00000000-03", b"forward 1")
+        self.assertEqual( self.system.collided_submarines, [self.system.lookup_submarine("00000000-02")] )
+
+    def test_get_furthest_submarine_after_large_move(self):
+        self.system.register_submarine("00000000-01")
+        self.system.register_submarine("00000000-02")
+
+        self._move_test_submarine("00000000-01", b"up 4000000000", b"forward 1")
+
+        self.assertEqual( self.system.get_furthest_submarine(), "|Submarine 00000000-01 at [4000000000, 1]|" )
+        self.assertEqual( self.system.get_highest_submarine(), "|Submarine 00000000-01 at [4000000000, 1]|" )
+
+    def test_get_submarines_by_position_after_moving_submarines_directly(self):
+        self.system.register_submarine("00000000-01")
+        self.system.register_submarine("00000000-02")
+
+        self.system._get_sub("00000000-01").move("up", 10)
+        self.assertEqual( self.system.get_highest_submarine(), "|Submarine 00000000-01 at [10, 0]|" )
+        self.assertEqual( self.system.get_furthest_submarine(), "|Submarine 00000000-01 at [10, 0]|" )
+
+        self.system._get_sub("00000000-02").move_totals({"up": 0, "down": 3, "forward": 20})
+        self.assertEqual( self.system.get_lowest_submarine(), "|Submarine 00000000-02 at [-3, 20]|" )
+        self.assertEqual( self.system.get_furthest_submarine(), "|Submarine 00000000-02 at [-3, 20]|" )
+        self.assertEqual( self.system.get_closest_submarine(), "|Submarine 00000000-01 at [10, 0]|" )
+
+    def test_move_with_non_str_direction(self):
+        self.system.register_submarine("00000000-01")
+        sub = self.system._get_sub("00000000-01")
+
+        sub.move(None, 1)
+
+        self.assertEqual(sub.position, (0, 0))
+        self.assertEqual( list(sub.movement_log), [((0, 0), None, 1, (0, 0))] )
+
+    def test_parse_and_apply_movement_reports_with_invalid_lines(self):
+        reports = [b"up 5", b"bad", b"sideways 2", b"forward x", b"forward 3", b"down 1", b"up 2", b"sideways 1"]
+
+        totals, invalid_directions, logged_moves, invalid_reports = self.system._parse_movement_reports(reports, 3)
+        self.assertEqual(totals, {"up": 5, "down": 0, "forward": 3})
+        self.assertEqual(invalid_directions, ["sideways"])
+        self.assertEqual(logged_moves, [("down", 1), ("up", 2), ("sideways", 1)])
+        self.assertEqual(invalid_reports, 2)
+
+        self.system.register_submarine("00000000-01")
+        self._move_test_submarine("00000000-01", *reports)
+
+        sub = self.system._get_sub("00000000-01")
+        self.assertEqual(sub.position, (6, 3))
+        self.assertEqual( list(sub.movement_log)[-3:], [((5, 3), "down", 1, (4, 3)), ((4, 3), "up", 2, (6, 3)), ((6, 3), "sideways", 1, (6, 3))] )
+
+    def test_move_submarines_by_reports_with_one_and_several_workers(self):
+        serial_numbers = ["78532608-69", "11003569-32", "11138201-81"]
+        results = []
+
+        for worker_processes in (1, 2):
+            system = SubmarineSystem(max_worker_processes=worker_processes)
+            for serial_number in serial_numbers:
+                system.register_submarine(serial_number)
+
+            self.assertEqual( list( system.move_submarines_by_reports(serial_numbers) ), serial_numbers )
+            results.append( (
+                [system.lookup_submarine(serial_number) for serial_number in serial_numbers],
+                [list( system.get_submarine_movement_log(serial_number) ) for serial_number in serial_numbers],
+                system.collided_submarines,
+            ) )
+
+        self.assertEqual(results[0], results[1])
+
     def test_register_faulty_submarine(self):
         with self.assertRaises(ValueError):
             self.system.register_submarine("hello")
@@ -82,6 +173,27 @@ class SubSysTest(unittest.TestCase):
 
         self.system._submarines.clear()
 
+    def test_order_torpedo_with_two_friendlies_in_line_of_fire(self):
+        for serial_number in ("00000000-01", "00000000-02", "00000000-03"):
+            self.system.register_submarine(serial_number)
+
+        # Moved out of registration order, the first registered friendly is still the one reported
+        self._move_test_submarine("00000000-03", b"up 3")
+        self._move_test_submarine("00000000-02", b"up 5")
+
+        result = self.system.order_torpedo("00000000-01", "up")
+        self.assertEqual( str(result), self.system.lookup_submarine("00000000-02") )
+        self.assertIs( self.system.order_torpedo("00000000-01", "up"), result )
+
+    def test_order_torpedo_after_moving_submarine_directly(self):
+        self.system.register_submarine("00000000-01")
+        self.system.register_submarine("00000000-02")
+
+        self.system._get_sub("00000000-02").move("up", 5)
+
+        self.assertIs( self.system.order_torpedo("00000000-01", "forward"), True )
+        self.assertEqual( str( self.system.order_torpedo("00000000-01", "up") ), self.system.lookup_submarine("00000000-02") )
+
     def test_order_torpedo_from_nonexistant_submarine(self):
         with self.assertRaises(LookupError):
             self.system.order_torpedo("123", "up")
@@ -90,6 +202,28 @@ class SubSysTest(unittest.TestCase):
         with self.assertRaises(LookupError):
             self.system.count_sensor_errors("123")
 
+    def test_count_sensor_errors_on_nonexistant_submarines(self):
+        with self.assertRaises(LookupError):
+            list( self.system.count_submarines_sensor_errors(["123"]) )
+
+    def test_count_submarines_sensor_errors_with_one_and_several_workers(self):
+        serial_numbers = ["78532608-69", "11003569-32", "11138201-81"]
+        for serial_number in serial_numbers:
+            self.system.register_submarine(serial_number)
+        expected = [ (serial_number, self.system.count_sensor_errors(serial_number)) for serial_number in serial_numbers ]
+
+        for worker_processes in (1, 2):
+            system = SubmarineSystem(max_worker_processes=worker_processes)
+            for serial_number in serial_numbers:
+                system.register_submarine(serial_number)
+
+            self.assertEqual( list( system.count_submarines_sensor_errors(serial_numbers) ), expected )
+
+    def test_set_worker_processes_on_a_system(self):
+        self.system.max_worker_processes = 1
+        self.assertEqual(self.system.max_worker_processes, 1)
+        self.assertEqual( SubmarineSystem(max_report_readers=4).max_report_readers, 4 )
+
     def test_get_sub_move_log_from_nonexistant_submarine(self):
         with self.assertRaises(LookupError):
             self.system.get_submarine_movement_log("123")
@@ -97,6 +231,10 @@ class SubSysTest(unittest.TestCase):
     def test_move_nonexistant_submarine_by_reports(self):
         with self.assertRaises(LookupError):
             self.system.move_submarine_by_reports("123")
+
+    def test_move_nonexistant_submarines_by_reports(self):
+        with self.assertRaises(LookupError):
+            list( self.system.move_submarines_by_reports(["123"]) )
     
     def test_get_submarines_by_position_when_none_registered(self):
         for method in (